@@ -7,9 +7,48 @@ class Settings(BaseSettings):
     DATABASE_NAME: str = config("DATABASE_NAME")
     SECRET_kEY: str = config("SECRET_KEY", "cosmos_secret_key")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    LOG_LEVEL: str = config("LOG_LEVEL", "INFO")
+    # per-logger overrides, e.g. "services.auth_service=DEBUG,azure=WARNING"
+    LOG_LEVELS: str = config("LOG_LEVELS", "")
+    # fraction of DEBUG records kept; per-logger overrides, e.g. "services.project_service=0.1"
+    LOG_DEBUG_SAMPLE_RATE: float = config("LOG_DEBUG_SAMPLE_RATE", 1.0, cast=float)
+    LOG_SAMPLE_RATES: str = config("LOG_SAMPLE_RATES", "")
+    LOG_QUEUE_SIZE: int = config("LOG_QUEUE_SIZE", 10000, cast=int)
+    # seconds per Cosmos operation; overrides as "container.operation=seconds",
+    # either part may be "*", e.g. "projects.read=1.5,*.query=10"
+    COSMOS_DEFAULT_TIMEOUT: float = config("COSMOS_DEFAULT_TIMEOUT", 5.0, cast=float)
+    COSMOS_TIMEOUTS: str = config("COSMOS_TIMEOUTS", "")
+    # hedged point reads: fire a second read after the observed latency percentile
+    COSMOS_HEDGE_ENABLED: bool = config("COSMOS_HEDGE_ENABLED", True, cast=bool)
+    COSMOS_HEDGE_PERCENTILE: float = config("COSMOS_HEDGE_PERCENTILE", 95.0, cast=float)
+    COSMOS_HEDGE_DEFAULT_DELAY: float = config("COSMOS_HEDGE_DEFAULT_DELAY", 0.05, cast=float)
+    COSMOS_HEDGE_MIN_SAMPLES: int = config("COSMOS_HEDGE_MIN_SAMPLES", 20, cast=int)
+    # at most ~COSMOS_HEDGE_BUDGET of reads are hedged (plus a burst of COSMOS_HEDGE_BURST),
+    # and none for COSMOS_HEDGE_THROTTLE_COOLDOWN seconds after a 429 from the container
+    COSMOS_HEDGE_BUDGET: float = config("COSMOS_HEDGE_BUDGET", 0.1, cast=float)
+    COSMOS_HEDGE_BURST: float = config("COSMOS_HEDGE_BURST", 10.0, cast=float)
+    COSMOS_HEDGE_THROTTLE_COOLDOWN: float = config("COSMOS_HEDGE_THROTTLE_COOLDOWN", 5.0, cast=float)
+    # cross-partition fan-out: feed range pages fetched at once, and pages buffered per range
+    COSMOS_QUERY_PARALLELISM: int = config("COSMOS_QUERY_PARALLELISM", 8, cast=int)
+    COSMOS_QUERY_BUFFER_PAGES: int = config("COSMOS_QUERY_BUFFER_PAGES", 2, cast=int)
+    # how long deleted projects stay as tombstones for /projects/changes
+    # (only enforced when TTL is enabled on the projects container, see readme)
+    PROJECT_TOMBSTONE_TTL: int = config("PROJECT_TOMBSTONE_TTL", 30 * 24 * 3600, cast=int)
+    # seconds a changes cursor stays behind "now", for writes not yet visible to the query
+    PROJECT_CHANGES_CLOCK_SKEW: int = config("PROJECT_CHANGES_CLOCK_SKEW", 60, cast=int)
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
 settings = Settings()
+
+
+def parse_mapping(raw: str, cast=str) -> dict:
+    """Parse "name.a=VALUE,name.b=VALUE" settings into a dict."""
+    result = {}
+    for pair in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, value = pair.partition("=")
+        if name and value:
+            result[name.strip()] = cast(value.strip())
+    return result
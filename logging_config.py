@@ -0,0 +1,192 @@
+# project-management-api/logging_config.py
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from config import settings, parse_mapping
+
+# request id of the request currently being handled, set by the middleware in main.py
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REDACTED = "***"
+
+# attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+# "\w*..._key" covers settings such as SECRET_KEY, COSMOS_KEY, ACCESS_KEY and PRIVATE_KEY
+_SECRET_KEYS = (
+    r"password|passwd|token|authorization|credential|hashed_password"
+    r"|\w*(?:secret|cosmos|access|private|signing|master|account|api)[_-]?key|secret"
+)
+_SECRET_KV_PATTERN = re.compile(
+    # quoted values run to the closing quote so secrets containing spaces are fully masked
+    rf"""(?P<key>["']?(?:{_SECRET_KEYS})["']?\s*[:=]\s*)(?:(?P<quote>["'])(?:\\.|(?!(?P=quote)).)*(?P=quote)|[^"',\s}}]+)""",
+    re.IGNORECASE,
+)
+_BEARER_PATTERN = re.compile(r"(Bearer\s+)[A-Za-z0-9\-._~+/]+=*", re.IGNORECASE)
+_JWT_PATTERN = re.compile(r"eyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+_SECRET_KEY_NAME = re.compile(_SECRET_KEYS, re.IGNORECASE)
+
+_traceback_formatter = logging.Formatter()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_stream_handler: Optional[logging.Handler] = None
+
+# uvicorn installs its own synchronous handlers on these and stops propagation
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+def redact(text: str) -> str:
+    """Mask password/token/key values and bearer tokens in a log line."""
+    # bearer first, otherwise "Authorization: Bearer <token>" masks only the word "Bearer"
+    text = _BEARER_PATTERN.sub(rf"\1{REDACTED}", text)
+    text = _SECRET_KV_PATTERN.sub(lambda m: f"{m.group('key')}{m.group('quote') or ''}{REDACTED}{m.group('quote') or ''}", text)
+    return _JWT_PATTERN.sub(REDACTED, text)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the current request id on the record while still in the request's context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps only a fraction of DEBUG records, configurable per logger name prefix."""
+
+    def __init__(self, default_rate: float, rates: Dict[str, float]):
+        super().__init__()
+        self.default_rate = default_rate
+        # longest prefix first so "services.auth_service" wins over "services"
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _rate_for(self, name: str) -> float:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return self.default_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge args now, but keep the traceback separate so the formatter can emit it as a field
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one redacted JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key in _RESERVED_ATTRS or key.startswith("_"):
+                continue
+            if _SECRET_KEY_NAME.search(key):
+                entry[key] = REDACTED
+            elif isinstance(value, (str, int, float, bool)) or value is None:
+                entry[key] = redact(value) if isinstance(value, str) else value
+            else:
+                entry[key] = redact(repr(value))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = redact(record.exc_text)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging() -> QueueListener:
+    """Route all logging through a bounded queue drained by a background thread."""
+    global _listener, _queue_handler, _stream_handler
+    if _listener is not None:
+        return _listener
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    # sample first so dropped debug records cost as little as possible
+    queue_handler.addFilter(DebugSamplingFilter(
+        settings.LOG_DEBUG_SAMPLE_RATE,
+        parse_mapping(settings.LOG_SAMPLE_RATES, float),
+    ))
+    queue_handler.addFilter(RequestContextFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name in _UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    for name, level in parse_mapping(settings.LOG_LEVELS, str.upper).items():
+        logging.getLogger(name).setLevel(level)
+
+    _queue_handler = queue_handler
+    _stream_handler = stream_handler
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def logging_stats() -> Dict[str, int]:
+    """Records dropped because the queue was full, and records still waiting to be written."""
+    if _queue_handler is None:
+        return {"dropped": 0, "queued": 0}
+    return {"dropped": _queue_handler.dropped, "queued": _queue_handler.queue.qsize()}
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the background thread and report any dropped records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        dropped = _queue_handler.dropped
+        if dropped:
+            # the queue is no longer drained, so write straight to the output handler
+            _stream_handler.handle(logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"{dropped} log records were dropped because the log queue was full",
+                "dropped": dropped,
+            }))
@@ -1,12 +1,15 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from database.cosmos_client import CosmosClientSingleton
 from routes import projects, users, auth
+from logging_config import setup_logging, shutdown_logging, logging_stats, request_id_var
+from services.latency import hedge_metrics
+from uuid import uuid4
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
@@ -14,6 +17,7 @@ async def lifespan(app: FastAPI):
     # Startup code here
     yield
     # Shutdown code here
+    shutdown_logging()
 
 app = FastAPI(title="Project Management API", version="1.0.0", lifespan=lifespan)
 
@@ -25,6 +29,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid4().hex
+    # not reset afterwards: uvicorn runs each request in its own task (so its own context),
+    # and the access log line is written after this middleware returns
+    request_id_var.set(request_id)
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(projects.router, prefix="/api/v1")
 # app.include_router(users.router, prefix="/api/v1") 
@@ -40,3 +54,13 @@ async def read_root():
         "docs": "/docs",
         "health": "/health"
     }
+
+@app.get("/metrics/hedging")
+async def read_hedging_metrics():
+    """Hedged read counters per container"""
+    return hedge_metrics.snapshot()
+
+@app.get("/metrics/logging")
+async def read_logging_metrics():
+    """Dropped and queued log record counts"""
+    return logging_stats()
@@ -1,6 +1,6 @@
 from enum import Enum
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from uuid import uuid4
 
@@ -12,7 +12,7 @@ class ProjectStatus(str, Enum):
     CANCELLED = "cancelled"
 
 class Project(BaseModel):
-    id: str = str(uuid4())
+    id: str = Field(default_factory=lambda: str(uuid4()))
     title: str
     description: Optional[str] = None
     status: ProjectStatus = ProjectStatus.PENDING
@@ -43,4 +43,16 @@ class ProjectResponse(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     updated_at: Optional[datetime] = None
-    owner_id: str
\ No newline at end of file
+    owner_id: str
+
+class ProjectTombstone(BaseModel):
+    id: str
+    owner_id: str
+    deleted: bool = True
+    deleted_at: datetime
+    ttl: Optional[int] = None
+
+class ProjectChanges(BaseModel):
+    changed: List[ProjectResponse]
+    deleted: List[str]
+    cursor: str
\ No newline at end of file
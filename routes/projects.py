@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from azure.cosmos.aio import CosmosClient
 from azure.cosmos.exceptions import CosmosResourceNotFoundError, CosmosHttpResponseError
 from models.project_model import Project, ProjectCreate, ProjectUpdate
@@ -9,7 +9,11 @@ from datetime import datetime
 from uuid import uuid4
 import json
 from services.project_service import ProjectService 
-from models.project_model import ProjectResponse
+from models.project_model import ProjectResponse, ProjectChanges
+from services.columnar_encoder import (
+    COLUMNAR_JSON_MEDIA_TYPE, COLUMNAR_MSGPACK_MEDIA_TYPE, encode_columnar, to_json, to_msgpack
+)
+from typing import Literal, Optional
 
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -28,13 +32,39 @@ async def create_project(project: ProjectCreate, user: User = Depends(auth_servi
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
                             
+def _columnar_media_type(request: Request, response_format: Optional[str]) -> Optional[str]:
+    if response_format == "json":
+        return None
+    if response_format == "columnar":
+        return COLUMNAR_JSON_MEDIA_TYPE
+    if response_format == "msgpack":
+        return COLUMNAR_MSGPACK_MEDIA_TYPE
+    accept = request.headers.get("accept", "")
+    for media_type in (COLUMNAR_MSGPACK_MEDIA_TYPE, COLUMNAR_JSON_MEDIA_TYPE):
+        if media_type in accept:
+            return media_type
+    return None
+
 @router.get("/")
-async def read_projects(user: User = Depends(auth_service.get_current_user)):
+async def read_projects(request: Request, response: Response, response_format: Optional[Literal["json", "columnar", "msgpack"]] = Query(None, alias="format"), user: User = Depends(auth_service.get_current_user)):
     try:
-        return await project_service.get_projects(user)
+        projects = await project_service.get_projects(user)
     except CosmosResourceNotFoundError:
         raise HTTPException(status_code=404, detail="No projects found")
 
+    media_type = _columnar_media_type(request, response_format)
+    if media_type is None:
+        # the body depends on Accept either way, so caches must key on it
+        response.headers["Vary"] = "Accept"
+        return projects
+    payload = encode_columnar(projects, dictionary_fields=("owner_id",))
+    body = to_msgpack(payload) if media_type == COLUMNAR_MSGPACK_MEDIA_TYPE else to_json(payload)
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+@router.get("/changes", response_model=ProjectChanges)
+async def read_project_changes(since: Optional[str] = None, user: User = Depends(auth_service.get_current_user)):
+    return await project_service.get_project_changes(since, user)
+
 @router.get("/{project_id}")
 async def read_project(project_id: str, user: User = Depends(auth_service.get_current_user)):
     try:
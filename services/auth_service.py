@@ -49,12 +49,12 @@ class AuthService(CosmosService[User]):
 
     async def get_user(self, username: str) -> User | None:
         try:
-            container = await self.get_container()
             query = "SELECT * FROM c WHERE c.username = @username"
             parameters = [{"name": "@username", "value": username}]
-            async for item in container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True):
-                return User(**item)
-            return None
+            items = await self.query(query, parameters)
+            return User(**items[0]) if items else None
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error fetching user {username}: {str(e)}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {str(e)}")
@@ -92,35 +92,26 @@ class AuthService(CosmosService[User]):
             raise credentials_exception
         
         try:
-            container = await self.get_container()
-            user = await container.read_item(item=username, partition_key=username)
+            user = await self.read_item(username, username)
             return User(**user)
         except CosmosResourceNotFoundError:
             raise credentials_exception
         
     async def generate_access_token(self, username: str, password: str) -> User | None:
-        # async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: CosmosClient = Depends(get_db)):
-        print(f"=== LOGIN ATTEMPT DEBUG ===")
-        print(f"Username received: '{username}'")
-        print(f"Password received: '{password}' (length: {len(password) if password else 0})")
+        logger.debug("Login attempt", extra={"username": username})
         
         if not username or not password:
-            print("ERROR: Username or password is empty!")
+            logger.warning("Login rejected: username or password is empty")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username and password are required"
             )
         
         try:
-        
-            print(f"Looking up user: '{username}'")
-        
             try:
-
                 user_data = await self.read(username, username)
-                print(f"User data retrieved: {user_data}")
             except CosmosResourceNotFoundError:
-                print(f"❌ USER '{username}' NOT FOUND")
+                logger.info("Login failed: user not found", extra={"username": username})
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Incorrect username or password",
@@ -128,31 +119,21 @@ class AuthService(CosmosService[User]):
                 )
        
             stored_hash = user_data.password
-            print(f"Stored hash: {stored_hash}")
             
             if not stored_hash:
-                print("ERROR: No hashed_password in user data")
+                logger.error("User data corrupted: no password hash", extra={"username": username})
                 raise HTTPException(status_code=500, detail="User data corrupted")
             
-            # Test password verification
-            print(f"Verifying password '{password}' against hash")
             is_valid = self.verify_password(password, stored_hash)
-            print(f"Password verification result: {is_valid}")
             
             if not is_valid:
-                print("❌ PASSWORD VERIFICATION FAILED")
-                # Let's also test what the hash should be
-                expected_hash = self.get_password_hash(password)
-                print(f"Expected hash for '{password}': {expected_hash}")
-                
+                logger.info("Login failed: invalid password", extra={"username": username})
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Incorrect username or password",
                     headers={"WWW-Authenticate": "Bearer"},
                 )
             
-            print("✅ PASSWORD VERIFICATION SUCCESS")
-            
             # Create user object and token
             # user = User(**user_data)
             access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -161,11 +142,11 @@ class AuthService(CosmosService[User]):
                 expires_delta=access_token_expires
             )
             
-            print("✅ TOKEN CREATED SUCCESSFULLY")
+            logger.debug("Access token issued", extra={"username": username})
             return {"access_token": access_token, "token_type": "bearer"}
             
         except CosmosResourceNotFoundError:
-            print(f"❌ USER '{username}' NOT FOUND")
+            logger.info("Login failed: user not found", extra={"username": username})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
@@ -173,8 +154,8 @@ class AuthService(CosmosService[User]):
             )
         except HTTPException:
             raise
-        except Exception as e:
-            print(f"❌ UNEXPECTED ERROR: {str(e)}")
+        except Exception:
+            logger.exception("Unexpected error during login", extra={"username": username})
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error"
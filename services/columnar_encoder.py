@@ -0,0 +1,79 @@
+# project-management-api/services/columnar_encoder.py
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence
+from pydantic import BaseModel
+import json
+import msgpack
+
+COLUMNAR_JSON_MEDIA_TYPE = "application/vnd.columnar+json"
+COLUMNAR_MSGPACK_MEDIA_TYPE = "application/vnd.columnar+msgpack"
+
+
+def _encode_dictionary(values: Sequence[Any]) -> Dict[str, list]:
+    """Store each distinct value once and refer to it by index; None stays None."""
+    dictionary: List[Any] = []
+    index: Dict[Any, int] = {}
+    codes: List[Optional[int]] = []
+    for value in values:
+        if value is None:
+            codes.append(None)
+            continue
+        if isinstance(value, Enum):
+            value = value.value
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(dictionary)
+            dictionary.append(value)
+        codes.append(code)
+    return {"dictionary": dictionary, "codes": codes}
+
+
+def _to_epoch_ms(value: datetime) -> int:
+    # naive datetimes are written with datetime.utcnow()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _encode_datetimes(values: Sequence[Optional[datetime]]) -> Dict[str, Any]:
+    """Epoch milliseconds stored as offsets from the smallest value in the column."""
+    millis = [None if value is None else _to_epoch_ms(value) for value in values]
+    present = [value for value in millis if value is not None]
+    base = min(present) if present else 0
+    return {
+        "unit": "ms",
+        "base": base,
+        "offsets": [None if value is None else value - base for value in millis],
+    }
+
+
+def encode_columnar(items: Sequence[BaseModel], dictionary_fields: Sequence[str] = ()) -> Dict[str, Any]:
+    """Turn a list of models into one array per field.
+
+    Enum fields and any field named in `dictionary_fields` are dictionary-encoded,
+    datetime fields are delta-encoded epoch milliseconds, everything else is a plain array.
+    """
+    if not items:
+        return {"count": 0, "columns": {}}
+
+    fields = list(type(items[0]).model_fields)
+    columns: Dict[str, Any] = {}
+    for field in fields:
+        values = [getattr(item, field) for item in items]
+        sample = next((value for value in values if value is not None), None)
+        if isinstance(sample, Enum) or field in dictionary_fields:
+            columns[field] = _encode_dictionary(values)
+        elif isinstance(sample, datetime):
+            columns[field] = _encode_datetimes(values)
+        else:
+            columns[field] = values
+    return {"count": len(items), "columns": columns}
+
+
+def to_json(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def to_msgpack(payload: Dict[str, Any]) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True)
@@ -1,17 +1,96 @@
 # project-management-api/services/base_service.py
-from typing import Generic, TypeVar, Type, Optional
+from typing import Any, AsyncIterator, Awaitable, Dict, Generic, List, Tuple, TypeVar, Type, Optional
 from azure.cosmos.database import DatabaseProxy
 from azure.cosmos.container import ContainerProxy
-from azure.cosmos.exceptions import CosmosResourceNotFoundError, CosmosHttpResponseError
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError, CosmosResourceNotFoundError, CosmosHttpResponseError
+from azure.core import MatchConditions
 from fastapi import HTTPException, status
 from database import CosmosClientSingleton
+from config import settings, parse_mapping
+from services.latency import HedgeBudget, LatencyTracker, hedge_metrics
+import asyncio
+import heapq
 import logging
 import json
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+_timeouts = parse_mapping(settings.COSMOS_TIMEOUTS, float)
+# shared per container so every service instance feeds the same hedge delay
+_read_latency: Dict[str, LatencyTracker] = {}
+_hedge_budgets: Dict[str, HedgeBudget] = {}
+# monotonic time until which a container is considered throttled
+_throttled_until: Dict[str, float] = {}
+
+_ORDER_BY_PATTERN = re.compile(r"\bORDER\s+BY\s+(.+?)\s*$", re.IGNORECASE | re.DOTALL)
+_ORDER_BY_TERM = re.compile(r"^\w+((?:\.[A-Za-z_]\w*)+)(?:\s+(ASC|DESC))?$", re.IGNORECASE)
+# clauses that are evaluated per feed range and would be wrong once the ranges are merged
+_UNSUPPORTED_FAN_OUT = [
+    (re.compile(r"\bSELECT\s+(?:VALUE\s+)?TOP\b", re.IGNORECASE), "TOP"),
+    (re.compile(r"\bSELECT\s+(?:VALUE\s+)?DISTINCT\b", re.IGNORECASE), "DISTINCT"),
+    (re.compile(r"\bOFFSET\b|\bLIMIT\b", re.IGNORECASE), "OFFSET/LIMIT"),
+    (re.compile(r"\bGROUP\s+BY\b", re.IGNORECASE), "GROUP BY"),
+    (re.compile(r"\b(?:COUNT|SUM|AVG|MIN|MAX)\s*\(", re.IGNORECASE), "aggregates"),
+]
+_END_OF_RANGE = object()
+
+
+def _validate_fan_out_query(query: str) -> None:
+    for pattern, clause in _UNSUPPORTED_FAN_OUT:
+        if pattern.search(query):
+            raise ValueError(f"Fan-out queries do not support {clause}: {query}")
+
+
+def _parse_order_by(query: str) -> List[Tuple[List[str], bool]]:
+    """Field paths and descending flags of an ORDER BY clause, e.g. "c.a.b DESC" -> (["a", "b"], True)."""
+    match = _ORDER_BY_PATTERN.search(query)
+    if not match:
+        return []
+    if re.search(r"\bSELECT\s+VALUE\b", query, re.IGNORECASE):
+        raise ValueError(f"Fan-out queries cannot merge ORDER BY over SELECT VALUE results: {query}")
+    order_by = []
+    for term in match.group(1).split(","):
+        term_match = _ORDER_BY_TERM.match(term.strip())
+        if not term_match:
+            raise ValueError(f"Fan-out ORDER BY only supports dotted paths like c.field [ASC|DESC], got {term.strip()!r}")
+        path = term_match.group(1).split(".")[1:]
+        descending = (term_match.group(2) or "").upper() == "DESC"
+        order_by.append((path, descending))
+    return order_by
+
+
+class _OrderedItem:
+    """Heap entry comparing items by ORDER BY terms; ties keep feed range order."""
+
+    __slots__ = ("keys", "order_by", "range_index", "item")
+
+    def __init__(self, item: dict, order_by: List[Tuple[List[str], bool]], range_index: int):
+        self.item = item
+        self.order_by = order_by
+        self.range_index = range_index
+        self.keys = []
+        for path, _ in order_by:
+            value = item
+            for part in path:
+                value = value.get(part) if isinstance(value, dict) else None
+            self.keys.append(value)
+
+    def __lt__(self, other: "_OrderedItem") -> bool:
+        for (_, descending), mine, theirs in zip(self.order_by, self.keys, other.keys):
+            if mine == theirs:
+                continue
+            # undefined/null sort first ascending, as in Cosmos
+            if mine is None or theirs is None:
+                less = mine is None
+            else:
+                less = mine < theirs
+            return not less if descending else less
+        return self.range_index < other.range_index
+
 class CosmosService(Generic[T]):
     def __init__(self, entity_type: Type[T], container_name: str, partition_key_path: str):
         self.entity_type = entity_type
@@ -28,14 +107,256 @@ class CosmosService(Generic[T]):
         database = await self._get_database()
         return database.get_container_client(self._container_name)
 
+    def _timeout(self, operation: str) -> float:
+        for key in (f"{self._container_name}.{operation}", f"{self._container_name}.*", f"*.{operation}"):
+            if key in _timeouts:
+                return _timeouts[key]
+        return settings.COSMOS_DEFAULT_TIMEOUT
+
+    async def _with_deadline(self, operation: str, awaitable: Awaitable, timeout: Optional[float] = None) -> Any:
+        if timeout is None:
+            timeout = self._timeout(operation)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{operation} on {self._container_name} exceeded {timeout}s deadline")
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=f"Timed out during {operation} on {self._container_name}")
+
+    async def _read_once(self, container: ContainerProxy, item_id: str, partition_key_value: str) -> dict:
+        try:
+            return await container.read_item(item=item_id, partition_key=partition_key_value)
+        except CosmosHttpResponseError as e:
+            if e.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+                _throttled_until[self._container_name] = time.monotonic() + settings.COSMOS_HEDGE_THROTTLE_COOLDOWN
+            raise
+
+    def _hedge_budget(self) -> HedgeBudget:
+        return _hedge_budgets.setdefault(self._container_name, HedgeBudget(settings.COSMOS_HEDGE_BUDGET, settings.COSMOS_HEDGE_BURST))
+
+    def _may_hedge(self) -> bool:
+        # hedging a throttled backend only adds load where it hurts most
+        if time.monotonic() < _throttled_until.get(self._container_name, 0.0):
+            return False
+        return self._hedge_budget().try_spend()
+
+    async def _timed_read(self, container: ContainerProxy, item_id: str, partition_key_value: str, tracker: LatencyTracker) -> dict:
+        """Read that always records its elapsed time, cut off at cancellation if it loses to a hedge.
+
+        Only the first request of a read is timed, so the tracker sees the latency the caller
+        experienced rather than just the latency of whichever request won.
+        """
+        started = time.perf_counter()
+        try:
+            return await self._read_once(container, item_id, partition_key_value)
+        finally:
+            tracker.record(time.perf_counter() - started)
+
+    async def _hedged_read(self, container: ContainerProxy, item_id: str, partition_key_value: str) -> dict:
+        """Point read that fires a second identical read if the first is slower than the usual tail."""
+        tracker = _read_latency.setdefault(self._container_name, LatencyTracker())
+        if not settings.COSMOS_HEDGE_ENABLED:
+            return await self._timed_read(container, item_id, partition_key_value, tracker)
+
+        hedge_metrics.increment(self._container_name, "requests")
+        self._hedge_budget().on_request()
+        delay = tracker.percentile(settings.COSMOS_HEDGE_PERCENTILE, settings.COSMOS_HEDGE_MIN_SAMPLES)
+        if delay is None:
+            delay = settings.COSMOS_HEDGE_DEFAULT_DELAY
+
+        primary = asyncio.ensure_future(self._timed_read(container, item_id, partition_key_value, tracker))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if self._may_hedge():
+                    hedge_metrics.increment(self._container_name, "hedges_fired")
+                    tasks.append(asyncio.ensure_future(self._read_once(container, item_id, partition_key_value)))
+                else:
+                    hedge_metrics.increment(self._container_name, "hedges_suppressed")
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    # a 404 is a definitive answer, anything else gives the other request a chance
+                    if error is None or isinstance(error, CosmosResourceNotFoundError):
+                        if len(tasks) > 1:
+                            hedge_metrics.increment(self._container_name, "primary_won" if task is primary else "hedge_won")
+                        return task.result()
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def read_item(self, item_id: str, partition_key_value: str) -> dict:
+        """Raw point read with deadline and hedging; Cosmos errors propagate unchanged."""
+        container = await self.get_container()
+        return await self._with_deadline("read", self._hedged_read(container, item_id, partition_key_value))
+
+    async def query(self, query: str, parameters: Optional[List[dict]] = None, **kwargs) -> List[dict]:
+        """Run a query to completion within the configured deadline."""
+        container = await self.get_container()
+
+        async def collect():
+            return [item async for item in container.query_items(query=query, parameters=parameters, **kwargs)]
+
+        return await self._with_deadline("query", collect())
+
+    @staticmethod
+    async def _read_feed_ranges(container: ContainerProxy) -> List[Dict[str, Any]]:
+        """One feed range per physical partition, served from the SDK's routing map cache."""
+        return [feed_range async for feed_range in container.read_feed_ranges()]
+
+    async def _produce_range(self, container: ContainerProxy, query: str, parameters: Optional[List[dict]],
+                             feed_range: Dict[str, Any], semaphore: asyncio.Semaphore, buffer: asyncio.Queue) -> None:
+        """Fetch one feed range page by page; the semaphore is held only while a page is in flight."""
+        try:
+            pages = container.query_items(query=query, parameters=parameters, feed_range=feed_range).by_page()
+            while True:
+                async with semaphore:
+                    page = await self._with_deadline("query", self._next_page(pages))
+                if page is None:
+                    break
+                if page:
+                    await buffer.put(page)
+        except Exception as e:
+            await buffer.put(e)
+            return
+        await buffer.put(_END_OF_RANGE)
+
+    @staticmethod
+    async def _next_page(pages) -> Optional[List[dict]]:
+        try:
+            page = await pages.__anext__()
+        except StopAsyncIteration:
+            return None
+        return [item async for item in page]
+
+    async def stream_query(self, query: str, parameters: Optional[List[dict]] = None,
+                           max_parallelism: Optional[int] = None) -> AsyncIterator[dict]:
+        """Cross-partition query run concurrently, one query per feed range (physical partition).
+
+        Only plain `SELECT ... FROM c [WHERE ...] [ORDER BY c.path [ASC|DESC], ...]` queries are
+        supported; TOP, DISTINCT, OFFSET/LIMIT, GROUP BY and aggregates are evaluated per range
+        and raise ValueError. Items are yielded as pages arrive; with ORDER BY the per-range
+        results (each already sorted by Cosmos) are k-way merged so the order holds overall.
+        """
+        _validate_fan_out_query(query)
+        order_by = _parse_order_by(query)
+        container = await self.get_container()
+        feed_ranges = await self._with_deadline("query", self._read_feed_ranges(container))
+        semaphore = asyncio.Semaphore(max_parallelism or settings.COSMOS_QUERY_PARALLELISM)
+        buffers = [asyncio.Queue(maxsize=settings.COSMOS_QUERY_BUFFER_PAGES) for _ in feed_ranges]
+        producers = [
+            asyncio.ensure_future(self._produce_range(container, query, parameters, feed_range, semaphore, buffer))
+            for feed_range, buffer in zip(feed_ranges, buffers)
+        ]
+        try:
+            if order_by:
+                async for item in self._merge_ordered(buffers, order_by):
+                    yield item
+            else:
+                async for item in self._merge_unordered(buffers):
+                    yield item
+        finally:
+            for producer in producers:
+                if not producer.done():
+                    producer.cancel()
+
+    @staticmethod
+    async def _next_range_page(buffer: asyncio.Queue) -> Optional[List[dict]]:
+        page = await buffer.get()
+        if page is _END_OF_RANGE:
+            return None
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+    async def _merge_unordered(self, buffers: List[asyncio.Queue]) -> AsyncIterator[dict]:
+        waiting = {asyncio.ensure_future(self._next_range_page(buffer)): buffer for buffer in buffers}
+        try:
+            while waiting:
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    buffer = waiting.pop(task)
+                    page = task.result()
+                    if page is None:
+                        continue
+                    waiting[asyncio.ensure_future(self._next_range_page(buffer))] = buffer
+                    for item in page:
+                        yield item
+        finally:
+            for task in waiting:
+                task.cancel()
+
+    async def _merge_ordered(self, buffers: List[asyncio.Queue], order_by: List[Tuple[List[str], bool]]) -> AsyncIterator[dict]:
+        heap = []
+        pages: Dict[int, List[dict]] = {}
+
+        async def push_next(index: int) -> None:
+            page = pages.get(index)
+            if not page:
+                page = await self._next_range_page(buffers[index])
+                if page is None:
+                    return
+                page.reverse()
+                pages[index] = page
+            heapq.heappush(heap, _OrderedItem(page.pop(), order_by, index))
+
+        await asyncio.gather(*(push_next(index) for index in range(len(buffers))))
+        while heap:
+            smallest = heapq.heappop(heap)
+            yield smallest.item
+            await push_next(smallest.range_index)
+
+    async def query_pages(self, query: str, parameters: Optional[List[dict]] = None,
+                          page_size: int = 100, max_parallelism: Optional[int] = None) -> AsyncIterator[List[dict]]:
+        """Fan-out query results regrouped into pages of `page_size` items.
+
+        Like query(), the whole query shares one "query" deadline, but only time spent waiting on
+        Cosmos counts; time the consumer spends between pages (e.g. a slow client) does not.
+        """
+        loop = asyncio.get_running_loop()
+        remaining = self._timeout("query")
+        stream = self.stream_query(query, parameters, max_parallelism)
+        try:
+            page = []
+            while True:
+                started = loop.time()
+                try:
+                    item = await self._with_deadline("query", stream.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    break
+                remaining -= loop.time() - started
+                page.append(item)
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+            if page:
+                yield page
+        finally:
+            await stream.aclose()
+
+    async def query_parallel(self, query: str, parameters: Optional[List[dict]] = None,
+                             max_parallelism: Optional[int] = None) -> List[dict]:
+        """Fan-out query collected into a list within the "query" deadline, like query()."""
+
+        async def collect():
+            return [item async for item in self.stream_query(query, parameters, max_parallelism)]
+
+        return await self._with_deadline("query", collect())
+
     async def create(self, entity: T) -> T:
         entity = await self.pre_create(entity)
         try:
             container = await self.get_container()
             item_data = json.loads(entity.model_dump_json())
-            await container.create_item(item_data)
+            await self._with_deadline("create", container.create_item(item_data))
             entity = await self.post_create(entity)
             return entity
+        except HTTPException:
+            raise
         except CosmosHttpResponseError as e:
             logger.error(f"Error creating {self._container_name}: {str(e)}")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error creating {self._container_name}: {str(e)}")
@@ -44,10 +365,16 @@ class CosmosService(Generic[T]):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {str(e)}")
 
     async def read(self, item_id: str, partition_key_value: str) -> Optional[T]:
+        entity, _ = await self.read_with_etag(item_id, partition_key_value)
+        return entity
+
+    async def read_with_etag(self, item_id: str, partition_key_value: str) -> Tuple[T, str]:
+        """Read plus the document's `_etag`, for a conditional update() afterwards."""
         try:
-            container = await self.get_container()
-            item = await container.read_item(item=item_id, partition_key=partition_key_value)
-            return self.entity_type(**item)
+            item = await self.read_item(item_id, partition_key_value)
+            return self.entity_type(**item), item.get("_etag")
+        except HTTPException:
+            raise
         except CosmosResourceNotFoundError:
             logger.error(f"{self._container_name} {item_id} not found")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{self._container_name} {item_id} not found")
@@ -58,12 +385,19 @@ class CosmosService(Generic[T]):
             logger.error(f"Unexpected error reading {self._container_name}: {str(e)}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {str(e)}")
 
-    async def update(self, item_id: str, entity: T, partition_key_value: str) -> T:
+    async def update(self, item_id: str, entity: T, partition_key_value: str, etag: Optional[str] = None) -> T:
+        """Replace the item; with `etag`, only if it has not changed since it was read."""
         try:
             container = await self.get_container()
             item_data = json.loads(entity.model_dump_json())
-            await container.replace_item(item=item_id, body=item_data)
+            conditions = {"etag": etag, "match_condition": MatchConditions.IfNotModified} if etag else {}
+            await self._with_deadline("update", container.replace_item(item=item_id, body=item_data, **conditions))
             return entity
+        except HTTPException:
+            raise
+        except CosmosAccessConditionFailedError:
+            logger.warning(f"{self._container_name} {item_id} changed since it was read")
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=f"{self._container_name} {item_id} was modified concurrently, retry")
         except CosmosResourceNotFoundError:
             logger.error(f"{self._container_name} {item_id} not found")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{self._container_name} {item_id} not found")
@@ -77,7 +411,9 @@ class CosmosService(Generic[T]):
     async def delete(self, item_id: str, partition_key_value: str) -> None:
         try:
             container = await self.get_container()
-            await container.delete_item(item=item_id, partition_key=partition_key_value)
+            await self._with_deadline("delete", container.delete_item(item=item_id, partition_key=partition_key_value))
+        except HTTPException:
+            raise
         except CosmosResourceNotFoundError:
             logger.error(f"{self._container_name} {item_id} not found")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{self._container_name} {item_id} not found")
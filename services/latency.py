@@ -0,0 +1,83 @@
+# project-management-api/services/latency.py
+from collections import deque
+from typing import Dict, Optional
+import math
+import threading
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies (seconds) used to pick hedge delays.
+
+    Percentiles are cached and only recomputed every `refresh_every` samples, so the
+    per-read cost is an append rather than a sort of the whole window.
+    """
+
+    def __init__(self, window: int = 1000, refresh_every: int = 50):
+        self._samples = deque(maxlen=window)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._cached: Dict[float, float] = {}
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_refresh += 1
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        if len(self._samples) < max(min_samples, 1):
+            return None
+        if self._since_refresh >= self._refresh_every:
+            self._cached.clear()
+            self._since_refresh = 0
+        if pct not in self._cached:
+            ordered = sorted(self._samples)
+            rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+            self._cached[pct] = ordered[min(rank, len(ordered) - 1)]
+        return self._cached[pct]
+
+
+class HedgeBudget:
+    """Token bucket capping hedges at roughly `ratio` of requests, plus a small burst."""
+
+    def __init__(self, ratio: float, burst: float):
+        self._ratio = ratio
+        self._burst = burst
+        self._tokens = burst
+
+    def on_request(self) -> None:
+        self._tokens = min(self._burst, self._tokens + self._ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class HedgeMetrics:
+    """Counters for hedged reads, keyed by container name."""
+
+    _FIELDS = ("requests", "hedges_fired", "hedges_suppressed", "hedge_won", "primary_won")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def increment(self, container: str, field: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(container, dict.fromkeys(self._FIELDS, 0))
+            counters[field] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for container, counters in self._counters.items():
+                entry = dict(counters)
+                fired = counters["hedges_fired"]
+                entry["hedge_rate"] = fired / counters["requests"] if counters["requests"] else 0.0
+                # share of fired hedges where the second request beat the first
+                entry["hedge_win_rate"] = counters["hedge_won"] / fired if fired else 0.0
+                result[container] = entry
+            return result
+
+
+hedge_metrics = HedgeMetrics()
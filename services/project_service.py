@@ -1,14 +1,19 @@
 # project-management-api/services/project_service.py
 from fastapi import HTTPException, Depends, status
 from models.user_model import User
-from models.project_model import Project, ProjectCreate, ProjectUpdate, ProjectResponse
+from models.project_model import Project, ProjectCreate, ProjectUpdate, ProjectResponse, ProjectTombstone, ProjectChanges
 from azure.cosmos.exceptions import CosmosResourceNotFoundError, CosmosHttpResponseError
 # from models.schemas import schemas as schemas
 from models.enums import UserRole, ProjectStatus
 from services.cosmos_service import CosmosService
 from services.auth_service import AuthService
+from config import settings
 from datetime import datetime
+import base64
+import binascii
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +21,13 @@ class ProjectService(CosmosService[Project]):
     def __init__(self):
         super().__init__(Project, container_name="projects", partition_key_path="/owner_id")
 
+    async def read_item(self, item_id: str, partition_key_value: str) -> dict:
+        item = await super().read_item(item_id, partition_key_value)
+        # deleted projects stay behind as tombstones for /projects/changes
+        if item.get("deleted"):
+            raise CosmosResourceNotFoundError(status_code=404, message=f"projects {item_id} not found")
+        return item
+
     async def create_project(self, project: ProjectCreate, user: User) -> ProjectResponse:
         if user.role == UserRole.MEMBER:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Members cannot create projects")
@@ -34,7 +46,7 @@ class ProjectService(CosmosService[Project]):
         # return ProjectResponse(**created_project.model_dump())
 
     async def update_project(self, project_id: str, project_update: ProjectUpdate, user: User) -> ProjectResponse:
-        existing_project = await self.read(project_id, user.id)
+        existing_project, etag = await self.read_with_etag(project_id, user.id)
         if existing_project.owner_id != user.id and user.role != UserRole.ADMIN:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not project owner")
 
@@ -48,21 +60,18 @@ class ProjectService(CosmosService[Project]):
             owner_id=existing_project.owner_id,
             updated_at=datetime.utcnow()
         )
-        updated_project = await self.update(project_id, updated_project, user.id)
+        # conditional on the read, so an update racing a delete cannot resurrect the project
+        updated_project = await self.update(project_id, updated_project, user.id, etag=etag)
         return ProjectResponse(**updated_project.model_dump())
     
     async def get_projects(self,  user: User):
-        print("USER ", user)
-        container = await self.get_container()
-        if user.role == UserRole.ADMIN:
-            query = "SELECT * FROM c"
-        else:
-            query = f"SELECT * FROM c WHERE c.owner_id = '{user.id}'"
+        logger.debug("Listing projects", extra={"user_id": user.id, "role": user.role})
         try:
-            items = []
-            async for item in container.query_items(query=query):
-                items.append(Project(**item))
-            return items
+            if user.role == UserRole.ADMIN:
+                items = await self.query_parallel("SELECT * FROM c WHERE NOT IS_DEFINED(c.deleted)")
+            else:
+                items = await self.query(f"SELECT * FROM c WHERE c.owner_id = '{user.id}' AND NOT IS_DEFINED(c.deleted)")
+            return [Project(**item) for item in items]
         except CosmosHttpResponseError as e:
             logger.error(f"Project query error: {str(e)}")
         raise HTTPException(status_code=400, detail="Error querying projects")
@@ -71,7 +80,7 @@ class ProjectService(CosmosService[Project]):
         
         try:
             project = await self.read(project_id, partition_key)
-            print("project:", project)
+            logger.debug("Project read", extra={"project_id": project_id})
             return project
         except CosmosResourceNotFoundError:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -80,8 +89,64 @@ class ProjectService(CosmosService[Project]):
             raise HTTPException(status_code=400, detail="Error reading project")
     
     async def delete_project(self, project_id, user):
-        project = self.read(project_id, user.id)
+        project, etag = await self.read_with_etag(project_id, user.id)
         if project is None:
             raise CosmosResourceNotFoundError(status_code=404, detail="Project doesn't exist")
         # self.check_project_access(True)
-        return await self.delete(project_id, user.id) 
\ No newline at end of file
+        # replacing the document with its tombstone is a single write, so the delete and
+        # the marker /projects/changes reports cannot diverge; the ttl expires it later
+        tombstone = ProjectTombstone(
+            id=project_id,
+            owner_id=project.owner_id,
+            deleted_at=datetime.utcnow(),
+            ttl=settings.PROJECT_TOMBSTONE_TTL,
+        )
+        await self.update(project_id, tombstone, user.id, etag=etag)
+
+    @staticmethod
+    def encode_cursor(ts: int) -> str:
+        return base64.urlsafe_b64encode(json.dumps({"ts": ts}).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str | None) -> int:
+        if not cursor:
+            return 0
+        try:
+            return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["ts"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    async def get_project_changes(self, since: str | None, user: User) -> ProjectChanges:
+        """Projects written and deleted at or after the cursor's `_ts`.
+
+        `_ts` has one-second resolution, so the boundary second is re-sent on the next
+        call; clients apply changes by id, which makes the overlap harmless.
+        """
+        since_ts = self.decode_cursor(since)
+        if since_ts and since_ts < time.time() - settings.PROJECT_TOMBSTONE_TTL:
+            # tombstones older than this have expired, so deletes could be missed
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Cursor expired, resync without since")
+        query = "SELECT * FROM c WHERE c._ts >= @since"
+        parameters = [{"name": "@since", "value": since_ts}]
+        if user.role == UserRole.ADMIN:
+            # the async SDK queries across partitions whenever partition_key is omitted
+            kwargs = {}
+        else:
+            query += " AND c.owner_id = @owner_id"
+            parameters.append({"name": "@owner_id", "value": user.id})
+            kwargs = {"partition_key": user.id}
+        try:
+            items = await self.query(query, parameters, **kwargs)
+        except CosmosHttpResponseError as e:
+            logger.error(f"Project changes query error: {str(e)}")
+            raise HTTPException(status_code=400, detail="Error querying project changes")
+
+        # move past quiet periods so the cursor never ages into the 410 window while nothing
+        # changes; the skew margin covers writes not yet visible when the query ran
+        issued_ts = int(time.time()) - settings.PROJECT_CHANGES_CLOCK_SKEW
+        latest_ts = max([since_ts, issued_ts] + [item["_ts"] for item in items])
+        return ProjectChanges(
+            changed=[ProjectResponse(**item) for item in items if not item.get("deleted")],
+            deleted=[item["id"] for item in items if item.get("deleted")],
+            cursor=self.encode_cursor(latest_ts),
+        )
\ No newline at end of file